@@ -12,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from openai import OpenAI
 from config import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL
 from prompts.chunker_prompts import BASIC_CHUNK_PROMPT
+from utils.llm_utils import chat_completion
 
 class ChineseChunkerAgent:
     """
@@ -30,17 +31,11 @@ class ChineseChunkerAgent:
         """
         # 构造 prompt
         prompt = BASIC_CHUNK_PROMPT.format(input_text=input_text)
-        # 调用 LLM
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": "你是一个专业的字幕助手。"},
-                {"role": "user", "content": prompt}
-            ],
-            stream=False
-        )
-        # 解析 LLM 返回内容
-        content = response.choices[0].message.content.strip()
+        # 调用 LLM（并发中的相同请求会合并为一次上游调用）
+        content = chat_completion(self.client, self.model, [
+            {"role": "system", "content": "你是一个专业的字幕助手。"},
+            {"role": "user", "content": prompt}
+        ])
         # 尝试解析为 Python 列表
         try:
             result = eval(content)
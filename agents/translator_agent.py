@@ -2,25 +2,51 @@
 translator_agent.py
 
 本模块实现翻译智能体（TranslationAgent），用于将中文短句列表翻译为英文短句列表。
+支持两级翻译：先用快速草稿模型生成完整译文，再在后台用主模型逐条精修。
 """
 
 import sys
 import os
+import threading
 # 将项目根目录（config.py 所在目录）加入到模块查找路径，便于直接运行和测试
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from openai import OpenAI
-from config import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL
+from config import OPENAI_API_KEY, OPENAI_BASE_URL, OPENAI_MODEL, OPENAI_DRAFT_MODEL
 from prompts.translator_prompts import BASIC_TRANSLATE_PROMPT
+from utils.llm_utils import chat_completion
 
 class TranslationAgent:
     """
     翻译智能体：负责将中文短句列表翻译为英文短句列表。
     """
-    def __init__(self):
+    def __init__(self, model=None, draft_model=None):
         # 初始化 OpenAI 客户端，兼容 DeepSeek API
         self.client = OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
-        self.model = OPENAI_MODEL
+        # model: 主翻译模型（高质量），默认取 OPENAI_MODEL
+        self.model = model or OPENAI_MODEL
+        # draft_model: 草稿翻译模型（快速/低成本），默认取 OPENAI_DRAFT_MODEL，为空表示不启用两级翻译
+        self.draft_model = draft_model if draft_model is not None else OPENAI_DRAFT_MODEL
+
+    @property
+    def two_tier(self) -> bool:
+        """是否启用两级翻译（草稿模型已配置且与主模型不同）。"""
+        return bool(self.draft_model) and self.draft_model != self.model
+
+    def _translate_chunk(self, chunk: str, model: str) -> str:
+        """
+        调用 LLM 翻译单条中文短句。
+        :param chunk: 中文短句
+        :param model: 使用的模型名称
+        :return: 英文短句
+        """
+        # 构造 prompt
+        prompt = BASIC_TRANSLATE_PROMPT.format(input_text=chunk)
+        # 调用 LLM（并发中的相同请求会合并为一次上游调用）
+        return chat_completion(self.client, model, [
+            {"role": "system", "content": "你是一个专业的中英字幕翻译助手。"},
+            {"role": "user", "content": prompt}
+        ])
 
     def translate(self, chinese_chunks: list) -> list:
         """
@@ -28,23 +54,42 @@ class TranslationAgent:
         :param chinese_chunks: 中文短句列表
         :return: 英文短句列表
         """
-        english_chunks = []
-        for idx, chunk in enumerate(chinese_chunks):
-            # 构造 prompt
-            prompt = BASIC_TRANSLATE_PROMPT.format(input_text=chunk)
-            # 调用 LLM
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的中英字幕翻译助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                stream=False
-            )
-            # 解析 LLM 返回内容
-            content = response.choices[0].message.content.strip()
-            english_chunks.append(content)
-        return english_chunks
+        return [self._translate_chunk(chunk, self.model) for chunk in chinese_chunks]
+
+    def translate_draft(self, chinese_chunks: list) -> list:
+        """
+        使用草稿模型快速翻译，生成完整的草稿英文短句列表。
+        未启用两级翻译时等同于 translate()。
+        :param chinese_chunks: 中文短句列表
+        :return: 草稿英文短句列表
+        """
+        if not self.two_tier:
+            return self.translate(chinese_chunks)
+        return [self._translate_chunk(chunk, self.draft_model) for chunk in chinese_chunks]
+
+    def refine_in_background(self, chinese_chunks: list, on_refined=None) -> tuple:
+        """
+        启动后台线程，用主模型逐条重新翻译，每完成一条即回调 on_refined(idx, text)。
+        单条翻译或回调失败时保留草稿译文并继续处理后续条目，失败序号记录在返回的 failed_indices 中。
+        :param chinese_chunks: 中文短句列表
+        :param on_refined: 回调函数，参数为 (序号, 精修后的英文短句)
+        :return: (已启动的后台线程, 失败序号列表)，join() 线程后可根据失败序号列表判断是否全部成功
+        """
+        failed_indices = []
+
+        def worker():
+            for idx, chunk in enumerate(chinese_chunks):
+                try:
+                    text = self._translate_chunk(chunk, self.model)
+                    if on_refined is not None:
+                        on_refined(idx, text)
+                except Exception as e:
+                    print(f"第{idx + 1}条精修失败，保留草稿译文：", e)
+                    failed_indices.append(idx)
+
+        thread = threading.Thread(target=worker, name="translation-refine")
+        thread.start()
+        return thread, failed_indices
 
 # 示例用法
 if __name__ == "__main__":
@@ -60,4 +105,4 @@ if __name__ == "__main__":
     english_chunks = agent.translate(chinese_chunks)
     print("翻译结果：")
     for idx, chunk in enumerate(english_chunks, 1):
-        print(f"{idx}. {chunk}") 
\ No newline at end of file
+        print(f"{idx}. {chunk}")
\ No newline at end of file
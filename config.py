@@ -17,6 +17,9 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.deepseek.com")
 # 默认模型名称
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "deepseek-chat")
+# 草稿翻译模型（快速/低成本），留空则关闭两级翻译，仅使用 OPENAI_MODEL 一次翻译
+# 设置后先用该模型快速生成完整草稿字幕，再在后台用 OPENAI_MODEL 逐条精修并覆盖输出
+OPENAI_DRAFT_MODEL = os.getenv("OPENAI_DRAFT_MODEL", "")
 
 # =====================
 # 字幕生成相关参数
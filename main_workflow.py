@@ -11,7 +11,10 @@ from agents.chunker_agent import ChineseChunkerAgent
 from agents.translator_agent import TranslationAgent
 from agents.english_srt_agent import EnglishSrtAgent
 from agents.chinese_srt_agent import ChineseSrtAgent
+from utils.srt_utils import write_srt_atomic
+from utils.llm_utils import get_coalesce_stats
 import sys
+import threading
 
 # GUI 配置对话框
 import tkinter as tk
@@ -209,15 +212,61 @@ def main(input_text=None, time_basis=None, agent_params=None):
     for idx, chunk in enumerate(chinese_chunks, 1):
         print(f"{idx}. {chunk}")
 
-    # 3. 翻译
-    print("\n正在翻译为英文...")
+    # 3. 翻译（配置了 OPENAI_DRAFT_MODEL 时先用草稿模型快速出稿）
     translator = TranslationAgent()
-    english_chunks = translator.translate(chinese_chunks)
+    if translator.two_tier:
+        print(f"\n正在使用草稿模型 {translator.draft_model} 快速翻译为英文...")
+        english_chunks = translator.translate_draft(chinese_chunks)
+    else:
+        print("\n正在翻译为英文...")
+        english_chunks = translator.translate(chinese_chunks)
     print(f"翻译结果（共{len(english_chunks)}条）：")
     for idx, chunk in enumerate(english_chunks, 1):
         print(f"{idx}. {chunk}")
 
-    # 4. SRT生成
+    # 4. SRT生成 & 5. 输出/保存SRT文件
+    en_srt_path, zh_srt_path, timestamps = save_srt_files(chinese_chunks, english_chunks, time_basis, agent_params)
+    print(f"\n英文SRT已保存到: {en_srt_path}")
+    print(f"中文SRT已保存到: {zh_srt_path}")
+
+    # 6. 两级翻译：后台用主模型逐条精修，每完成一条即原子覆盖输出文件
+    # 时间轴固定沿用草稿生成的 timestamps，精修只替换英文字幕文本，不会移动已有字幕的时间
+    # 注意：此处会等待精修全部完成后才返回，草稿文件在此期间即可先行使用
+    if translator.two_tier:
+        print(f"\n草稿字幕已可使用，正在后台使用 {translator.model} 精修译文...")
+        refined_chunks = list(english_chunks)
+        write_lock = threading.Lock()
+
+        def on_refined(idx, text):
+            with write_lock:
+                # 写入成功后才更新已精修列表，避免写入失败的条目在后续覆盖中被悄悄带出
+                updated_chunks = list(refined_chunks)
+                updated_chunks[idx] = text
+                save_en_srt_file(updated_chunks, timestamps)
+                refined_chunks[idx] = text
+            print(f"已精修第{idx + 1}条：{text}")
+
+        refine_thread, failed = translator.refine_in_background(chinese_chunks, on_refined)
+        refine_thread.join()
+        if failed:
+            print(f"\n精修部分完成：{len(chinese_chunks) - len(failed)}/{len(chinese_chunks)} 条已更新，"
+                  f"第 {', '.join(str(i + 1) for i in failed)} 条保留草稿译文。")
+        else:
+            print("\n精修完成，SRT文件已更新。")
+
+    # 单次运行内各请求依次执行，通常不会合并；仅在并发运行多个任务（如批量处理）出现合并时输出统计
+    stats = get_coalesce_stats()
+    if stats["coalesced"] > 0:
+        print(f"\nLLM 请求统计：共 {stats['requests']} 次，实际调用 {stats['upstream']} 次，合并 {stats['coalesced']} 次")
+
+# 沿用已有时间轴，只重新生成并原子写入英文SRT（用于两级翻译精修时原位替换，中文SRT不变无需重写）
+def save_en_srt_file(english_chunks, timestamps):
+    en_srt_path = os.path.join(OUTPUT_DIR, "output_en.srt")
+    write_srt_atomic(en_srt_path, ChineseSrtAgent().generate_srt(english_chunks, timestamps))
+    return en_srt_path
+
+# 根据中英文短句生成SRT内容并原子写入输出目录，返回 (英文SRT路径, 中文SRT路径, 时间戳列表)
+def save_srt_files(chinese_chunks, english_chunks, time_basis, agent_params):
     if time_basis == "zh":
         print("\n以中文为依据生成时间戳...")
         from agents.chinese_timestamp_agent import ChineseTimestampAgent
@@ -234,17 +283,13 @@ def main(input_text=None, time_basis=None, agent_params=None):
         zh_srt_agent = ChineseSrtAgent()
         zh_srt_content = zh_srt_agent.generate_srt(chinese_chunks, timestamps)
 
-    # 5. 输出/保存SRT文件
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
     en_srt_path = os.path.join(OUTPUT_DIR, "output_en.srt")
     zh_srt_path = os.path.join(OUTPUT_DIR, "output_zh.srt")
-    with open(en_srt_path, "w", encoding="utf-8") as f:
-        f.write(en_srt_content)
-    with open(zh_srt_path, "w", encoding="utf-8") as f:
-        f.write(zh_srt_content)
-    print(f"\n英文SRT已保存到: {en_srt_path}")
-    print(f"中文SRT已保存到: {zh_srt_path}")
+    write_srt_atomic(en_srt_path, en_srt_content)
+    write_srt_atomic(zh_srt_path, zh_srt_content)
+    return en_srt_path, zh_srt_path, timestamps
 
 if __name__ == "__main__":
     # 判断是否为交互式终端，优先弹出GUI
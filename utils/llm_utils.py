@@ -0,0 +1,168 @@
+"""
+llm_utils.py
+
+本模块封装各智能体共用的 LLM 调用工具，包括并发请求合并（singleflight）及其计数。
+多个线程同时发出相同 (客户端端点, model, messages) 的请求时，只向上游发起一次调用，结果分发给所有等待方。
+运行 python utils/llm_utils.py 可进行并发合并自检。
+"""
+
+import json
+import threading
+
+def _clone_error(error: BaseException) -> BaseException:
+    """
+    复制异常实例（同类型、同 args 与属性，但不调用 __init__），供各等待方各自抛出。
+    :param error: 上游调用抛出的原始异常
+    :return: 与原始异常同类型的新实例；无法复制时返回原实例
+    """
+    try:
+        clone = error.__class__.__new__(error.__class__, *error.args)
+        clone.args = error.args
+        clone.__dict__.update(error.__dict__)
+        return clone
+    except Exception:
+        return error
+
+class _InFlightCall:
+    """
+    一次正在进行中的上游调用，供等待方共享结果或异常。
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    并发请求合并器：相同 key 的请求在进行中时，后来者等待并复用同一结果。
+    仅合并并发中的请求，调用完成后即移除，不做持久缓存。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        # 计数：总请求数、实际上游调用数、被合并的请求数
+        self._stats = {"requests": 0, "upstream": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        """
+        执行 fn() 并返回其结果；若相同 key 的调用正在进行中，则等待并共享其结果。
+        :param key: 请求标识（可哈希）
+        :param fn: 无参可调用对象，实际发起上游请求
+        :return: fn() 的返回值
+        """
+        with self._lock:
+            self._stats["requests"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._stats["upstream"] += 1
+                leader = True
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                # 包括 KeyboardInterrupt/SystemExit，保证等待方不会拿到 None
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+            return call.result
+
+        call.done.wait()
+        if call.error is not None:
+            # 每个等待方抛出与原始异常同类型的副本，调用方按 openai 异常类型捕获/重试的逻辑不受影响，
+            # 同时避免多线程同时抛出同一实例导致 traceback 混杂；原始异常（含发起方 traceback）见 __cause__
+            raise _clone_error(call.error) from call.error
+        return call.result
+
+    def stats(self) -> dict:
+        """返回计数快照：requests / upstream / coalesced。"""
+        with self._lock:
+            return dict(self._stats)
+
+# 进程内共享的合并器，TranslationAgent 与 ChineseChunkerAgent 共用
+_llm_flight = SingleFlight()
+
+# 工具函数：调用 chat completions 并返回文本内容（并发相同请求自动合并）
+def chat_completion(client, model: str, messages: list) -> str:
+    """
+    调用 LLM 并返回去除首尾空白的回复内容。
+    相同 (客户端端点, model, messages) 的并发请求共享一次上游调用；
+    仅在调用方并发运行智能体（如批量处理多个文件）时才会产生合并。
+    上游调用失败时，所有等待方都会收到与原始异常同类型的异常（如 openai.RateLimitError），
+    被合并的等待方收到的是副本，原始异常可通过 __cause__ 获取。
+    :param client: OpenAI 客户端
+    :param model: 模型名称
+    :param messages: 对话消息列表
+    :return: LLM 回复内容字符串
+    """
+    # key 包含客户端的 base_url 与 api_key，避免不同端点/账号之间错误共享结果
+    key = (
+        str(getattr(client, "base_url", "")),
+        getattr(client, "api_key", None),
+        model,
+        json.dumps(messages, ensure_ascii=False, sort_keys=True),
+    )
+
+    def call():
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=False
+        )
+        return response.choices[0].message.content.strip()
+
+    return _llm_flight.do(key, call)
+
+# 工具函数：获取请求合并计数
+def get_coalesce_stats() -> dict:
+    """
+    获取 LLM 请求合并计数。
+    :return: {"requests": 总请求数, "upstream": 实际上游调用数, "coalesced": 被合并的请求数}
+    """
+    return _llm_flight.stats()
+
+# 示例用法：并发发出 N 个相同请求，验证只产生一次上游调用
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    N = 5
+    release = threading.Event()
+    upstream_calls = []
+
+    class _BlockingCompletions:
+        def create(self, model, messages, stream):
+            upstream_calls.append(model)
+            # 阻塞直到所有线程都已发出请求，确保请求确实并发
+            release.wait(timeout=5)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Hello. "))])
+
+    client = SimpleNamespace(base_url="https://example.invalid", api_key="test",
+                             chat=SimpleNamespace(completions=_BlockingCompletions()))
+    messages = [{"role": "user", "content": "你好。"}]
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(chat_completion(client, "demo", messages)))
+               for _ in range(N)]
+    for t in threads:
+        t.start()
+    # 等待所有请求进入合并器后再放行上游调用
+    while get_coalesce_stats()["requests"] < N:
+        threading.Event().wait(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    stats = get_coalesce_stats()
+    print("结果：", results)
+    print("计数：", stats)
+    assert results == ["Hello."] * N
+    assert len(upstream_calls) == 1
+    assert stats["upstream"] == 1 and stats["coalesced"] == N - 1
+    print("并发请求合并校验通过。")
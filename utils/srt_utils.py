@@ -4,10 +4,17 @@ srt_utils.py
 本模块封装 SRT 字幕相关的通用工具函数，包括时间戳格式化、SRT 条目生成等。
 """
 
+import os
 import srt
+import stat
 import datetime
+import tempfile
 from typing import List
 
+# 进程 umask（os.umask 只能"设置并返回旧值"，为避免在后台线程中临时改动全局 umask，导入时读取一次）
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
 # 工具函数：根据英文文本和朗读速率计算持续时长（秒）
 def estimate_duration(text: str, wpm: int = 150, min_duration: float = 1.0, lang: str = "en") -> float:
     """
@@ -47,4 +54,29 @@ def format_srt(subtitles: List[srt.Subtitle]) -> str:
     :param subtitles: SRT 条目列表
     :return: SRT 文件内容字符串
     """
-    return srt.compose(subtitles) 
\ No newline at end of file
+    return srt.compose(subtitles) 
+
+# 工具函数：原子写入 SRT 文件
+def write_srt_atomic(path: str, content: str) -> None:
+    """
+    先写入同目录下的临时文件，再用 os.replace 替换目标文件，
+    保证读取方任何时刻看到的都是完整的 SRT 内容（用于两级翻译后台精修时覆盖输出）。
+    :param path: 目标 SRT 文件路径
+    :param content: SRT 文件内容字符串
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix=".srt.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        # mkstemp 创建的临时文件权限为 0600，替换前恢复为目标文件原有权限（不存在时按 umask 计算）
+        if os.path.exists(path):
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        else:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise